@@ -34,11 +34,12 @@ __date__ = "2024-04-10"
 
 import os
 import sys
-from PyQt6.QtCore import Qt, QDir, QStandardPaths, QUrl, QTimer
-from PyQt6.QtGui import QIcon, QAction, QPalette, QColor, QFileSystemModel, QDesktopServices, QPixmap
+from PyQt6.QtCore import Qt, QDir, QStandardPaths, QUrl, QTimer, QPoint, QModelIndex, pyqtSlot
+from PyQt6.QtGui import QAction, QPalette, QColor, QFileSystemModel, QDesktopServices, QPixmap, QPixmapCache
 from PyQt6.QtWidgets import QApplication, QMainWindow, QTreeView, QHBoxLayout, QWidget, QSplitter, QMenu, QMenuBar, QMessageBox, QFileDialog, QSplashScreen
 from src.ImageEditorWindow import ImageViewerWindow
 from src.FolderExplorer import FolderExplorer
+from src.WidgetUtils import load_icon
 
 class MainWindow(QMainWindow):
     def __init__(self, splash):
@@ -193,10 +194,12 @@ class MainWindow(QMainWindow):
         self.update()  # Ensure the main window and all its children are repainted
 
 
+    @pyqtSlot()
     def show_help(self):
         QMessageBox.information(self, "Help", "This section will provide help and FAQs related to the application.")
 
 
+    @pyqtSlot()
     def show_license(self):
         # Create a QMessageBox
         msg_box = QMessageBox()
@@ -222,9 +225,11 @@ class MainWindow(QMainWindow):
         # Display the message box
         msg_box.exec()
 
+    @pyqtSlot()
     def show_homepage(self):
         QDesktopServices.openUrl(QUrl("https://github.com/akaraoglu/visuAlysium"))  # Replace with your actual URL
 
+    @pyqtSlot()
     def about(self):
         msg_box = QMessageBox()
         msg_box.setWindowTitle("About")
@@ -251,7 +256,9 @@ class MainWindow(QMainWindow):
     def setup_folder_tree_view(self):
         # Left panel: Folder tree view
         self.folder_model = QFileSystemModel()
-        self.folder_model.setRootPath(QDir.rootPath())
+        # Only the default folder and its parents are gathered and watched up front,
+        # everything else is fetched lazily when it is expanded in the tree
+        self.folder_model.setRootPath(self.default_path)
         self.folder_tree_view.setModel(self.folder_model)
         self.folder_tree_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.folder_tree_view.customContextMenuRequested.connect(self.open_menu)
@@ -261,6 +268,7 @@ class MainWindow(QMainWindow):
         self.folder_tree_view.setCurrentIndex(default_index)
         self.folder_tree_view.setColumnWidth(0, 250)  # Set the width of the "Name" column
 
+    @pyqtSlot(str)
     def set_folder_tree_view_path(self, new_path):
         default_index = self.folder_model.index(new_path)
         self.folder_tree_view.setCurrentIndex(default_index)
@@ -272,6 +280,7 @@ class MainWindow(QMainWindow):
         menu.addAction(open_image_action)
         menu.exec(self.image_list_widget.viewport().mapToGlobal(position))
         
+    @pyqtSlot(QPoint)
     def open_menu(self, position):
         menu = QMenu()
         show_images_action = QAction("Show Images", self)
@@ -279,6 +288,7 @@ class MainWindow(QMainWindow):
         menu.addAction(show_images_action)
         menu.exec(self.folder_tree_view.viewport().mapToGlobal(position))
 
+    @pyqtSlot(QModelIndex)
     def folder_selected(self, index):
         folder_path = self.folder_model.filePath(index)
         self.load_images(folder_path)
@@ -291,21 +301,25 @@ class MainWindow(QMainWindow):
         self.image_viewer_window.show()
         self.image_viewer_window.show_new_image(image_path)
 
+    @pyqtSlot(str)
     def open_image_viewer(self, image_path):
         self.image_viewer_window.show()
         self.image_viewer_window.show_new_image(image_path)
 
+    @pyqtSlot()
     def open_folder(self):
         folder_path = QFileDialog.getExistingDirectory(self, "Select Folder")
         if folder_path:
             self.load_images(folder_path)
 
+    @pyqtSlot()
     def open_image(self):
         file_dialog = QFileDialog()
         image_path, _ = file_dialog.getOpenFileName(self, "Open Image", QDir.homePath(), "Image Files (*.png *.jpg *.jpeg *.bmp *.gif)")
         if image_path:
             self.open_image_viewer(image_path)
 
+    @pyqtSlot()
     def exit_application(self):
         reply = QMessageBox.question(self, 'Exit Confirmation', 
                                     'Are you sure you want to exit?', 
@@ -328,6 +342,12 @@ def main():
         ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(u'Visualysium.ExImaVi.ImageVisualizer.0.01') # Arbitrary string
 
     app = QApplication(sys.argv)
+    # Set the names early, QStandardPaths locations (e.g. the thumbnail cache) depend on them
+    app.setApplicationName("VisuAlysium")
+    app.setApplicationDisplayName("VisuAlysium")
+
+    # In-memory cache for folder thumbnails, evicted least recently used first (limit in KB)
+    QPixmapCache.setCacheLimit(131072)
     
     # Set the application style to Fusion
     # ['Breeze', 'Oxygen', 'QtCurve', 'Windows', 'Fusion']
@@ -361,10 +381,8 @@ def main():
     ####################
     window.show()
     icon_path = "icons/main_icon.png"
-    app_icon = QIcon(icon_path)
+    app_icon = load_icon(icon_path)
     app.setWindowIcon(app_icon)
-    app.setApplicationName("VisuAlysium")
-    app.setApplicationDisplayName("VisuAlysium")
     
 
     sys.exit(app.exec())
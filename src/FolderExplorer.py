@@ -1,20 +1,38 @@
 
 import os
 import sys
-from PyQt6.QtCore import Qt, QModelIndex, QDir, QSize, pyqtSignal, pyqtSlot, QThread
-from PyQt6.QtGui import QPixmap, QFont, QIcon, QPalette, QFileSystemModel
+import math
+import itertools
+from PyQt6.QtCore import Qt, QModelIndex, QDir, QSize, pyqtSignal, pyqtSlot, QThreadPool, QTimer
+from PyQt6.QtGui import QPixmap, QPixmapCache, QImage, QFont, QPalette, QFileSystemModel
 from PyQt6.QtWidgets import QApplication, QPushButton, QVBoxLayout, QLineEdit, QHBoxLayout, QWidget,QListView
 
-from src.ImageProcessingAlgorithms import supported_extensions
-# supported_extensions_list = [ext.replace('*.', '') for ext in raw_extensions]
+from src.ImageProcessingAlgorithms import supported_extensions, supported_suffixes
+from src.ThumbnailLoader import ThumbnailBatchWorker, can_decode_suffix
+from src.WidgetUtils import load_icon
 
 class FileSystemModelImagesOnly(QFileSystemModel):
     def __init__(self, cacheWidth=100, cacheHeight=100):
         super().__init__()
-        self.previews = {'None': None}
+        self.loading = set()  # Paths whose thumbnail is queued or being decoded
+        self.failed = set()   # Preview cache keys of files that could not be decoded, shown with the default file icon
+        self.pending = {}   # file path -> ThumbnailBatchWorker that has not delivered its result yet
+        self.queued_paths = []  # Requested since the last dispatch, in paint order
+        self.request_counter = 0
+        self.max_batch_size = 32
         self.cacheWidth = cacheWidth
         self.cacheHeight = cacheHeight
         self.ncols = 2
+
+        # Thumbnails are decoded in parallel on worker threads, never in data()
+        # One pool for the lifetime of the model, its work is cancelled when the folder changes
+        self.thread_pool = QThreadPool()
+
+        # Requests made while the view paints are collected and dispatched together afterwards
+        self.dispatch_timer = QTimer()
+        self.dispatch_timer.setSingleShot(True)
+        self.dispatch_timer.setInterval(0)
+        self.dispatch_timer.timeout.connect(self.dispatch_previews)
         
         # Specify the types of files to show
         self.setNameFilters(supported_extensions)
@@ -25,24 +43,88 @@ class FileSystemModelImagesOnly(QFileSystemModel):
         self.setFilter(QDir.Filter.AllDirs | QDir.Filter.Files | QDir.Filter.NoDotAndDotDot) 
 
     def getPreview(self, index):
-        itemName = super().data(index, Qt.ItemDataRole.DisplayRole)
-
-        if itemName not in self.previews:
-            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)  # Set cursor to waiting
-
-            qpm = QPixmap(self.rootPath() + "/" + itemName)
-
-            if qpm is None or qpm.isNull():
-                qpm = super().data(index, Qt.ItemDataRole.DecorationRole)
-                if qpm and not qpm.isNull():
-                    qpm = qpm.pixmap(self.cacheWidth, self.cacheHeight)
-            if qpm and not qpm.isNull():
-                qpm = qpm.scaled(self.cacheWidth, self.cacheHeight, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-
-            self.previews[itemName] = qpm
-            QApplication.restoreOverrideCursor()  # Restore the cursor
+        if self.isDir(index):
+            # Drawn at the thumbnail size, like the file icons
+            icon = super().data(index, Qt.ItemDataRole.DecorationRole)
+            if icon and not icon.isNull():
+                return icon.pixmap(self.cacheWidth, self.cacheHeight)
+            return icon
+
+        cache_key = self.preview_cache_key(index)
+        qpm = QPixmapCache.find(cache_key)
+        if qpm is not None and not qpm.isNull():
+            return qpm
+
+        file_path = self.filePath(index)
+        # A failure is keyed like the cache, so a file that changes afterwards (e.g. finished copying) is retried
+        if file_path not in self.loading and cache_key not in self.failed and self.can_decode(index):
+            self.loading.add(file_path)
+            self.queued_paths.append(file_path)
+            self.dispatch_timer.start()
+
+        # Show the default file icon until the worker delivers the thumbnail
+        qpm = super().data(index, Qt.ItemDataRole.DecorationRole)
+        if qpm and not qpm.isNull():
+            qpm = qpm.pixmap(self.cacheWidth, self.cacheHeight)
+        return qpm
+
+    def can_decode(self, index):
+        # Files Qt has no decoder for (e.g. RAW) keep the default icon without queueing any work
+        return can_decode_suffix(self.fileInfo(index).suffix())
+
+    def preview_cache_key(self, index):
+        # The model already knows the modification time and size, so building the key needs no stat
+        return f"thumbnail|{self.filePath(index)}|{self.lastModified(index).toMSecsSinceEpoch()}|{self.size(index)}"
+
+    @pyqtSlot()
+    def dispatch_previews(self):
+        paths = iter(self.queued_paths)
+        # Spread the requests over the pool threads, with at most max_batch_size files per worker
+        batch_size = min(self.max_batch_size, math.ceil(len(self.queued_paths) / self.thread_pool.maxThreadCount()))
+        self.queued_paths = []
+
+        # Later requests get a higher priority: what is on screen right now is decoded first
+        self.request_counter += 1
+        batch = list(itertools.islice(paths, batch_size))
+        while batch:
+            worker = ThumbnailBatchWorker(batch, self.cacheWidth, self.cacheHeight)
+            worker.signals.result.connect(self.preview_loaded)
+            for file_path in batch:
+                self.pending[file_path] = worker
+            self.thread_pool.start(worker, self.request_counter)
+            batch = list(itertools.islice(paths, batch_size))
+
+    def cancel_preview(self, file_path):
+        worker = self.pending.pop(file_path, None)
+        if worker is not None:
+            worker.cancel(file_path)
+            self.loading.discard(file_path)  # Requested again when the item becomes visible
+
+    def cancel_all_previews(self):
+        # Called when the folder changes: nothing that is queued is going to be visible anymore
+        for file_path, worker in self.pending.items():
+            worker.cancel(file_path)
+        self.pending = {}
+        self.loading = set()
+        self.queued_paths = []
+        self.dispatch_timer.stop()
+        self.thread_pool.clear()  # Drops the workers that have not started yet
+
+    @pyqtSlot(str, QImage)
+    def preview_loaded(self, file_path, image):
+        self.pending.pop(file_path, None)
+        self.loading.discard(file_path)
+        index = self.index(file_path)
+        if image.isNull():
+            # The default file icon is already shown, there is nothing to repaint
+            if index.isValid():
+                self.failed.add(self.preview_cache_key(index))
+            return
 
-        return self.previews[itemName]
+        if index.isValid():
+            # QPixmap must be created on the GUI thread, so the conversion happens here
+            QPixmapCache.insert(self.preview_cache_key(index), QPixmap.fromImage(image))
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
 
     def data(self, index, role):
         if role == Qt.ItemDataRole.DecorationRole:
@@ -61,6 +143,7 @@ class FolderExplorer(QWidget):
         super().__init__()
         
         self.gridSize = QSize(140, 140)  # Initial grid size
+        self.thumbnail_buffer_rows = 2  # Rows outside the viewport whose thumbnails are still loaded
 
         self.path = dir_path
         self.files = FileSystemModelImagesOnly()
@@ -102,7 +185,7 @@ class FolderExplorer(QWidget):
 
         # Create UP button
         self.upButton = QPushButton()
-        self.upButton.setIcon(QIcon('icons/undo.png'))  # Ensure you have an 'up_arrow.png' in your resources
+        self.upButton.setIcon(load_icon('icons/undo.png'))  # Ensure you have an 'up_arrow.png' in your resources
         self.upButton.clicked.connect(self.navigate_up)
 
         # Layout for the path editor and the UP button
@@ -118,12 +201,24 @@ class FolderExplorer(QWidget):
         self.setLayout(layout)
 
         self.view.doubleClicked.connect(self.on_double_clicked)
+        self.view.verticalScrollBar().valueChanged.connect(self.prune_thumbnail_queue)
+
+    @pyqtSlot(int)
+    def prune_thumbnail_queue(self, value):
+        # Cancel thumbnails of items scrolled out of view, keeping a buffer of rows above and below
+        buffer_height = self.thumbnail_buffer_rows * self.view.gridSize().height()
+        keep_rect = self.view.viewport().rect().adjusted(0, -buffer_height, 0, buffer_height)
+        for file_path in list(self.files.pending):
+            index = self.files.index(file_path)
+            if not index.isValid() or not self.view.visualRect(index).intersects(keep_rect):
+                self.files.cancel_preview(file_path)
 
     def update_colors(self):
         palette = QApplication.instance().palette()
         self.setStyleSheet(f"background-color: {palette.color(QPalette.ColorRole.Base).name()};")
         # Add more style changes as needed based on the widget's components
 
+    @pyqtSlot()
     def navigate_up(self):
         # Navigate up one directory level
         current_directory = QDir(self.path)
@@ -131,6 +226,7 @@ class FolderExplorer(QWidget):
             new_path = current_directory.path()
             self.update_root_path(new_path)
 
+    @pyqtSlot()
     def update_path_from_line_edit(self):
         # Update the root path based on the text in QLineEdit
         new_path = self.pathLineEdit.text()
@@ -156,11 +252,13 @@ class FolderExplorer(QWidget):
         """Update the view to show files from a new directory."""
         self.path = new_path
         self.pathLineEdit.setText(self.path)
+        self.files.cancel_all_previews()
         self.files.setRootPath(self.path)
         self.view.setRootIndex(self.files.index(self.path))
         self.view.scrollToTop()  # Ensures the view starts at the top of the new directory
         self.path_updated.emit(self.path)
 
+    @pyqtSlot(QModelIndex)
     def on_double_clicked(self, index: QModelIndex):
         if not index.isValid():
             return
@@ -191,11 +289,11 @@ class FolderExplorer(QWidget):
             # Get the file path from the model
             file_path = self.files.filePath(index)
 
-            if os.path.isdir(file_path):
+            if self.files.isDir(index):  # Answered by the model, without another stat call
                 # If it's a directory, update the view to show the contents of this directory
                 self.update_root_path(file_path)
 
-            elif file_path.endswith(tuple(supported_extensions_list)):  # Check if it's an image
+            elif self.files.fileInfo(index).suffix().lower() in supported_suffixes:  # Check if it's an image
                 # Optionally do something specific for image files, like opening in an image viewer
                 self.open_image_viewer(file_path)
 
@@ -1,14 +1,17 @@
 from PyQt6.QtWidgets import QApplication, QGridLayout, QLabel, QListWidget, QListWidgetItem, QWidget, QSizePolicy, QVBoxLayout, QMenu
-from PyQt6.QtGui import QPixmap, QIcon
-from PyQt6.QtCore import pyqtSlot, pyqtSignal, Qt, QSize
+from PyQt6.QtGui import QPixmap, QImage, QIcon, QContextMenuEvent
+from PyQt6.QtCore import pyqtSlot, pyqtSignal, pyqtBoundSignal, Qt, QSize, QTemporaryDir, QFile, QObject, QRunnable, QThreadPool
 from src.ImageViewer import ImageViewer
-from src.WidgetUtils import HoverButton
+from src.WidgetUtils import HoverButton, load_icon
 from src.WindowCropping import WindowCropping
 
 from src.WindowLighting import WindowLighting
 from src.WindowColors import WindowColors
 from src.WindowCurveAdjustement import WindowCurveAdjustement
 
+# PNG quality 80 maps to zlib level 1: lossless, and fast enough to write full resolution images
+HISTORY_PNG_QUALITY = 80
+
 class ImageEditor_ButtonLayout(QWidget):
     
     # Define signals for different button actions
@@ -32,29 +35,49 @@ class ImageEditor_ButtonLayout(QWidget):
         self.setLayout(layout)
 
         # Create and add buttons for each action
-        self.add_button("icons/histogram.png", "Histogram", self.button_histogram_clicked)
-        self.add_button("icons/crop.png", "Cropping", self.button_crop_clicked)
-        self.add_button("icons/brightness.png", "Lighting", self.button_brightness_clicked)
-        self.add_button("icons/colors.png", "Colors", self.button_colors_clicked)
-        self.add_button("icons/edit-image.png", "Curves", self.button_edit_curve_clicked)
-        self.add_button("icons/edit-image-2.png", "Sharpness", self.button_effects_clicked)
+        self.add_button(load_icon("icons/histogram.png"), "Histogram", self.button_histogram_clicked)
+        self.add_button(load_icon("icons/crop.png"), "Cropping", self.button_crop_clicked)
+        self.add_button(load_icon("icons/brightness.png"), "Lighting", self.button_brightness_clicked)
+        self.add_button(load_icon("icons/colors.png"), "Colors", self.button_colors_clicked)
+        self.add_button(load_icon("icons/edit-image.png"), "Curves", self.button_edit_curve_clicked)
+        self.add_button(load_icon("icons/edit-image-2.png"), "Sharpness", self.button_effects_clicked)
         # Assuming the "De-Noise" button should have a unique action, use `button_de_noise_clicked` signal
-        self.add_button("icons/edit-image-2.png", "De-Noise", self.button_de_noise_clicked)
+        self.add_button(load_icon("icons/edit-image-2.png"), "De-Noise", self.button_de_noise_clicked)
         
         
 
-    def add_button(self, icon, tooltip, signal):
+    def add_button(self, icon: QIcon, tooltip: str, signal: pyqtBoundSignal) -> None:
         # Assuming HoverButton is a custom button class that supports `setToolTip` and `clicked` signal
         new_button = HoverButton(self, text=tooltip, icon=icon, button_size=self.button_size, icon_size=self.icon_size)
         new_button.setToolTip(tooltip)  # Set tooltip for the button
         new_button.clicked.connect(signal.emit)  # Connect button click to the respective signal
         self.layout().addWidget(new_button)  # Add button to the layout
 
+class HistoryImageWriterSignals(QObject):
+    # Emitted with the history image id and whether the PNG was written
+    saved = pyqtSignal(int, bool)
+
+
+class HistoryImageWriter(QRunnable):
+    """Writes a full resolution history image to disk off the GUI thread."""
+
+    def __init__(self, image_id: int, image: QImage, image_path: str) -> None:
+        super().__init__()
+        self.image_id = image_id
+        self.image = image
+        self.image_path = image_path
+        self.signals = HistoryImageWriterSignals()
+
+    def run(self) -> None:
+        saved = self.image.save(self.image_path, "PNG", HISTORY_PNG_QUALITY)
+        self.signals.saved.emit(self.image_id, saved)
+
+
 class HistoryWidget(QWidget):
-    show_image_requested = pyqtSignal(QPixmap)
+    show_image_requested = pyqtSignal(QImage)
     delete_image_requested = pyqtSignal(int)
 
-    def __init__(self):
+    def __init__(self) -> None:
         super().__init__()
 
         layout = QVBoxLayout(self)
@@ -63,37 +86,79 @@ class HistoryWidget(QWidget):
 
         self.history_list_widget = QListWidget()
         self.history_list_widget.setViewMode(QListWidget.ViewMode.IconMode)
-        self.history_list_widget.setIconSize(QSize(300, 100))
+        self.item_size = QSize(200, 120)
+        self.history_list_widget.setIconSize(QSize(200, 100))  # Fits into the item, leaving room for the text
         self.history_list_widget.setWordWrap(True)
         self.history_list_widget.setSpacing(10)
 
         layout.addWidget(self.history_list_widget)
-        self.original_pixmaps = []  # List to store original pixmaps
+
+        # Full resolution images are kept on disk, only the scaled item icons stay in memory once written
+        self.history_dir = QTemporaryDir()
+        self.image_counter = 0  # Unique id of every history image, also used as its file name
+        # Paths of the full resolution images, keyed by the id stored in the item's UserRole data
+        self.original_paths: dict[int, str] = {}
+        # Images not written to disk (yet), served from memory until their writer has finished
+        self.in_memory_images: dict[int, QImage] = {}
+        # A single thread writes the PNGs one after the other, the GUI thread never waits for the disk
+        self.writer_pool = QThreadPool()
+        self.writer_pool.setMaxThreadCount(1)
         # Connect the itemDoubleClicked signal to a slot
         self.history_list_widget.itemDoubleClicked.connect(self.onItemDoubleClicked)
     
-    def clearHistory(self):
+    def clearHistory(self) -> None:
         self.history_list_widget.clear()
-        for pix in self.original_pixmaps:
-            del pix # Also remove the pixmap reference
-        self.original_pixmaps = []
-
-    def update_history_list(self, pixmap, description=""):
-        self.original_pixmaps.append(pixmap)  # Store the original pixmap
-        # icon = QIcon(pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))  # Scale for display
-        # item = QListWidgetItem(icon, description)
-        item = QListWidgetItem(QIcon(pixmap), description)
+        for image_path in self.original_paths.values():
+            QFile.remove(image_path)  # Images still being written are removed by history_image_saved
+        self.original_paths = {}
+        self.in_memory_images = {}
+
+    def update_history_list(self, pixmap: QPixmap, description: str = "") -> None:
+        image_id = self.image_counter
+        self.image_counter += 1
+        image_path = self.history_dir.filePath(f"{image_id}.png")
+        self.original_paths[image_id] = image_path
+        # QPixmap is GUI-thread only, the writer gets a QImage
+        image = pixmap.toImage()
+        self.in_memory_images[image_id] = image
+        writer = HistoryImageWriter(image_id, image, image_path)
+        writer.signals.saved.connect(self.history_image_saved)
+        self.writer_pool.start(writer)
+
+        # Scale once to the painted size, so the view does not rescale the icon on every repaint
+        icon_size = self.history_list_widget.iconSize()
+        thumb = pixmap.scaled(icon_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.FastTransformation)
+        item = QListWidgetItem(QIcon(thumb), description)
         item.setToolTip(description)
-        item.setSizeHint(QSize(200, 120))
+        item.setSizeHint(self.item_size)
         item.setTextAlignment(Qt.AlignmentFlag.AlignHCenter)
+        item.setData(Qt.ItemDataRole.UserRole, image_id)
         self.history_list_widget.addItem(item)
             
-    def onItemDoubleClicked(self, item):
-        row = self.history_list_widget.row(item)
-        if row != -1:
-            self.show_image_requested.emit(self.original_pixmaps[row])
-
-    def contextMenuEvent(self, event):
+    @pyqtSlot(int, bool)
+    def history_image_saved(self, image_id: int, saved: bool) -> None:
+        if image_id not in self.original_paths:
+            # Deleted or cleared while it was being written
+            QFile.remove(self.history_dir.filePath(f"{image_id}.png"))
+        elif saved:
+            del self.in_memory_images[image_id]  # Read back from disk from now on
+        else:
+            # Keep the image in memory, so the history entry still works
+            print(f"Failed to store history image: {self.original_paths[image_id]}")
+
+    @pyqtSlot(QListWidgetItem)
+    def onItemDoubleClicked(self, item: QListWidgetItem) -> None:
+        self.show_image_requested.emit(self.load_history_image(item))
+
+    def load_history_image(self, item: QListWidgetItem) -> QImage:
+        # Read the full resolution image of a history item back from disk, as a QImage:
+        # the QPixmap for display is created by the viewer that shows it
+        image_id = item.data(Qt.ItemDataRole.UserRole)
+        if image_id in self.in_memory_images:
+            return self.in_memory_images[image_id]
+        return QImage(self.original_paths[image_id])
+
+    def contextMenuEvent(self, event: QContextMenuEvent) -> None:
         context_menu = QMenu(self)
         show_action = context_menu.addAction("Show Image")
         delete_action = context_menu.addAction("Delete Image")
@@ -110,16 +175,19 @@ class HistoryWidget(QWidget):
 
         if action == show_action:
             if row != -1:
-                self.show_image_requested.emit(self.original_pixmaps[row])
+                self.show_image_requested.emit(self.load_history_image(self.history_list_widget.item(row)))
         elif action == delete_action:
             if row != -1:
                 self.delete_image_requested.emit(row)
-                self.history_list_widget.takeItem(row)
-                del self.original_pixmaps[row]  # Also remove the pixmap reference
+                item = self.history_list_widget.takeItem(row)
+                # The full resolution image is not needed anymore
+                image_id = item.data(Qt.ItemDataRole.UserRole)
+                QFile.remove(self.original_paths.pop(image_id))
+                self.in_memory_images.pop(image_id, None)
                 if row < self.history_list_widget.count(): 
-                    self.show_image_requested.emit(self.original_pixmaps[row])
+                    self.show_image_requested.emit(self.load_history_image(self.history_list_widget.item(row)))
                 else:
-                    self.show_image_requested.emit(self.original_pixmaps[row-1])
+                    self.show_image_requested.emit(self.load_history_image(self.history_list_widget.item(row-1)))
 
 class ImageViewerWindow(QWidget):
     def __init__(self):
@@ -193,9 +261,11 @@ class ImageViewerWindow(QWidget):
         self.image_viewer.keyPressEvent(event)
         super().keyPressEvent(event)
         
-    def show_image_from_history(self, pixmap):
-        self.image_viewer.show_pixmap(pixmap)  # Assuming your ImageViewer widget has a method to set a QPixmap
+    @pyqtSlot(QImage)
+    def show_image_from_history(self, image):
+        self.image_viewer.show_pixmap(QPixmap.fromImage(image))
 
+    @pyqtSlot(int)
     def delete_image_from_history(self, index):
         # Handle the deletion of an image from the history
         print(f"Image at index {index} has been requested to delete")
@@ -208,22 +278,27 @@ class ImageViewerWindow(QWidget):
         self.history_widget.update_history_list(self.image_viewer.get_current_pixmap(), "Original Image")
         self.image_viewer.show_image_initial_size()
 
+    @pyqtSlot()
     def crop_button_clicked(self):
         self.crop_window.show()
         self.crop_window.set_image(self.image_viewer.get_current_pixmap())
         
+    @pyqtSlot()
     def brightness_button_clicked(self):
         self.lighting_window.show()
         self.lighting_window.set_image(self.image_viewer.get_current_pixmap())
 
+    @pyqtSlot()
     def colors_button_clicked(self):
         self.colors_window.show()
         self.colors_window.set_image(self.image_viewer.get_current_pixmap())
 
+    @pyqtSlot()
     def button_edit_curve_clicked(self):
         self.curve_editing.show()
         self.curve_editing.set_image(self.image_viewer.get_current_pixmap())
 
+    @pyqtSlot(QPixmap, str)
     def editing_confirmed(self, pixmap, description):
         print("Editing confirmed!")
         self.image_viewer.show_pixmap(pixmap)
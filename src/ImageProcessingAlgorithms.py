@@ -39,6 +39,7 @@ import OpenEXR
 import Imath
 import rawpy
 from PyQt6.QtGui import QImage, QImageReader
+import src.ImageProcessingKernels as ImageProcessingKernels
 from numpy.lib.stride_tricks import as_strided
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
@@ -71,7 +72,14 @@ standard_extensions = [
 
 exr_extensions = ['*.exr', '*.EXR']
 
-supported_extensions = raw_extensions + standard_extensions #+ exr_extensions
+# Alternative suffixes of TIFF and JPEG files, which Qt's image plugins also read
+qt_extensions = ['*.tif', '*.jfif']
+
+supported_extensions = raw_extensions + standard_extensions + qt_extensions #+ exr_extensions
+
+# Bare lower case suffixes, for set lookups on a file name's suffix
+raw_suffixes = {ext[2:] for ext in raw_extensions}
+supported_suffixes = {ext[2:] for ext in supported_extensions}
 
 kelvin_list = [1000, 1100, 1200, 1300, 1400, 1500, 1600, 1700, 1800, 1900,
             2000, 2100, 2200, 2300, 2400, 2500, 2600, 2700, 2800, 2900,
@@ -368,8 +376,7 @@ def adjust_contrast_brightness_gamma(image, contrast_amount, brightness_amount,
     image_global = cv2.LUT(image, adjusted_range)
     adjusted_shadows = np.clip((image_global) + (shadows_amount * 255), 0, 255).astype(np.uint8)
     adjusted_highlights = np.clip((image_global) + (highlights_amount * 255), 0, 255).astype(np.uint8)
-    mask_norm = (weight_mask[:,:,None]/255.0)
-    return ( mask_norm * adjusted_highlights) + ((1-mask_norm) * adjusted_shadows)
+    return ImageProcessingKernels.blend_images(adjusted_shadows, adjusted_highlights, weight_mask)
 
 # Adjust Sharpening
 def color_sharpening(image, amount):
@@ -547,7 +554,7 @@ def exr_to_numpy(exr_file):
 def load_image_to_qimage(image_path):
 
     # Check if the file is a RAW file by its extension
-    if any(image_path.lower().endswith(ext[1:]) for ext in raw_extensions):
+    if image_path.rpartition('.')[2].lower() in raw_suffixes:
         try:
             # Handle RAW files
             with rawpy.imread(image_path) as raw:
@@ -621,15 +628,9 @@ def apply_lut_local(image, lut_1, lut_2, channels, mask):
         # Convert to HSV, interpolate LUT for the V channel, convert back to RGB
         hsv_image = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
         v_channel = hsv_image[:, :, 2]
-        output_channel = np.zeros_like(v_channel, dtype=np.uint8)
         
         # Applying LUTs based on the mask
-        for i in range(256):
-            use_lut_1 = lut_1[i] * (1 - mask)
-            use_lut_2 = lut_2[i] * mask
-            output_channel[v_channel == i] = (use_lut_1 + use_lut_2)[v_channel == i]
-        
-        hsv_image[:, :, 2] = output_channel
+        hsv_image[:, :, 2] = ImageProcessingKernels.blend_luts(v_channel, lut_1, lut_2, mask)
         return cv2.cvtColor(hsv_image, cv2.COLOR_HSV2RGB)
     else:
         # Apply the LUT to the respective RGB channel
@@ -645,12 +646,7 @@ def apply_lut_local(image, lut_1, lut_2, channels, mask):
         selected_channel_index = channel_map[channels]
         selected_channel = [channel_red, channel_green, channel_blue][selected_channel_index]
         
-        output_channel = np.zeros_like(selected_channel, dtype=np.uint8)
-        
-        for i in range(256):
-            use_lut_1 = lut_1[i] * (1 - mask)
-            use_lut_2 = lut_2[i] * mask
-            output_channel[selected_channel == i] = (use_lut_1 + use_lut_2)[selected_channel == i]
+        output_channel = ImageProcessingKernels.blend_luts(selected_channel, lut_1, lut_2, mask)
         
         output_image = cv2.merge((channel_red, channel_green, channel_blue))
         output_image[:, :, selected_channel_index] = output_channel
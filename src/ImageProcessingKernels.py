@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# This file is part of VisuAlysium, which is released under the GNU General Public License (GPL).
+# See the LICENSE or COPYING file in the root of this project or visit
+# http://www.gnu.org/licenses/gpl-3.0.html for the full text of the license.
+
+"""
+VisuAlysium
+=================================================================
+
+This file includes the per-pixel kernels used by the image processing algorithms.
+They are compiled with numba when it is installed, otherwise the NumPy versions are used.
+
+(c) Visualysium, 2024
+"""
+
+import numpy as np
+
+try:
+    # Optional: numba compiles the kernels to parallel machine code
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def blend_luts_numpy(channel, lut_1, lut_2, mask):
+    """
+    Map a channel through two lookup tables and blend the results per pixel.
+
+    :param channel: 2D uint8 array.
+    :param lut_1: 256 entry lookup table used where the mask is 0.
+    :param lut_2: 256 entry lookup table used where the mask is 1.
+    :param mask: 2D float array with the blending weights in [0, 1].
+    :return: 2D uint8 array.
+    """
+    return (lut_1[channel] * (1 - mask) + lut_2[channel] * mask).astype(np.uint8)
+
+
+def blend_images_numpy(image_low, image_high, weight_mask):
+    """
+    Blend two images of the same shape with a per-pixel weight.
+
+    :param image_low: 3D uint8 array used where the mask is 0.
+    :param image_high: 3D uint8 array used where the mask is 255.
+    :param weight_mask: 2D uint8 array with the blending weights.
+    :return: 3D uint8 array.
+    """
+    mask_norm = weight_mask[:, :, None] / 255.0
+    return (mask_norm * image_high + (1 - mask_norm) * image_low).astype(np.uint8)
+
+
+if njit is not None:
+    # cache=True stores the compiled code on disk, so only the first run pays the compilation
+    @njit(parallel=True, cache=True)
+    def blend_luts_numba(channel, lut_1, lut_2, mask):
+        height, width = channel.shape
+        output = np.empty((height, width), dtype=np.uint8)
+        for y in prange(height):
+            for x in range(width):
+                value = channel[y, x]
+                weight = mask[y, x]
+                output[y, x] = np.uint8(lut_1[value] * (1.0 - weight) + lut_2[value] * weight)
+        return output
+
+    @njit(parallel=True, cache=True)
+    def blend_images_numba(image_low, image_high, weight_mask):
+        height, width, channels = image_low.shape
+        output = np.empty((height, width, channels), dtype=np.uint8)
+        for y in prange(height):
+            for x in range(width):
+                weight = weight_mask[y, x] / 255.0
+                for c in range(channels):
+                    output[y, x, c] = np.uint8(weight * image_high[y, x, c] + (1.0 - weight) * image_low[y, x, c])
+        return output
+
+    blend_luts = blend_luts_numba
+    blend_images = blend_images_numba
+else:
+    blend_luts = blend_luts_numpy
+    blend_images = blend_images_numpy
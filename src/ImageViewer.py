@@ -419,6 +419,15 @@ class ImageViewer(QGraphicsView):
 
         # self.reset_rect()
 
+    def clear_image(self):
+        # Drop all pixmaps of the viewer, e.g. when its window is closed
+        if self.pixmap_item:
+            self.scene.removeItem(self.pixmap_item)
+            self.pixmap_item = None
+        self.original_pixmap = None
+        self.previous_pixmap = None
+        self.current_pixmap = None
+
     def open_new_image(self, image_path):
         self.image_path = image_path
         image = ImageProcessingAlgorithms.load_image_to_qimage(image_path)
@@ -696,6 +705,10 @@ class ImageViewer(QGraphicsView):
     def adjust_lightning(self, contrast_value, brightness_value, gamma_value, shadows_value, highlights_value):
         print("Adjust Contrast: %.2f  Brightness: %.2f  Gamma: %.2f Shadows: %.2f Highlights: %.2f" % (contrast_value, brightness_value, gamma_value, shadows_value, highlights_value))
 
+        # Nothing to adjust while no image is set, e.g. when the sliders are reset before a new image is installed
+        if self.original_pixmap is None:
+            return
+
         mask_fulres_cv = self.create_mask_luminance()
 
         image_cv = self.convert_pixmap_to_opencv_image(self.get_original_pixmap())
@@ -706,6 +719,9 @@ class ImageViewer(QGraphicsView):
 
     def adjust_colors(self, temperature_value, saturation_value, hue_value, red_value, green_value, blue_value):
         print("Adjust Colors : temperature_value:  %.2f, saturation_value:  %.2f, hue_value:  %.2f, red_value:  %.2f, green_value:  %.2f, blue_value: %.2f" % (temperature_value, saturation_value, hue_value, red_value, green_value, blue_value))
+
+        if self.original_pixmap is None:
+            return
         
         temperature_value = np.clip(temperature_value*5500 + 1050, 1000, 12000)
         print("Adjust Temperature: %.2f Kelvin" % (temperature_value))
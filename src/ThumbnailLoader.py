@@ -0,0 +1,194 @@
+import os
+import hashlib
+import threading
+from PyQt6.QtCore import Qt, QObject, QRunnable, QStandardPaths, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QImageIOHandler
+
+try:
+    # Optional: libvips shrinks on load and resamples with SIMD, faster than Qt for large images
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
+_cache_dir = None
+_decodable_suffixes = None
+
+# Larger images are only thumbnailed if their decoder can scale while decoding
+MAX_THUMBNAIL_SOURCE_PIXELS = 50_000_000
+
+
+def can_decode_suffix(suffix):
+    """
+    Return whether a thumbnail can be decoded from a file with the given suffix.
+
+    Covers both decoders: the Qt image plugins and, when installed, libvips (which
+    usually adds e.g. heic and jp2). The set is built on first use, once the
+    QApplication exists and the image plugins can all be found; at import time
+    QImageReader may not report all of them yet.
+    """
+    global _decodable_suffixes
+    if _decodable_suffixes is None:
+        _decodable_suffixes = {fo.data().decode().lower() for fo in QImageReader.supportedImageFormats()}
+        if pyvips is not None:
+            _decodable_suffixes |= {s.lstrip('.').lower() for s in pyvips.get_suffixes()}
+    return suffix.lower() in _decodable_suffixes
+
+
+def thumbnail_cache_dir():
+    # Resolved lazily so the application name is already set when the location is queried.
+    # An empty string means there is no writable cache location and the on-disk cache is disabled.
+    global _cache_dir
+    if _cache_dir is None:
+        cache_location = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+        # Joining an empty location would give a relative directory in the working directory
+        _cache_dir = os.path.join(cache_location, "thumbnails") if cache_location else ""
+    return _cache_dir
+
+
+def thumbnail_cache_path(image_path, width, height):
+    """
+    Return the on-disk cache file for a thumbnail, or None if the on-disk cache is disabled.
+
+    The key covers the absolute path, modification time and size of the source file,
+    so editing or replacing an image invalidates its cached thumbnail.
+    """
+    cache_dir = thumbnail_cache_dir()
+    if not cache_dir:
+        return None
+    stat = os.stat(image_path)
+    key_source = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{width}x{height}"
+    key = hashlib.blake2b(key_source.encode()).hexdigest()
+    return os.path.join(cache_dir, key[:2], key + ".png")
+
+
+def decode_thumbnail_vips(image_path, width, height):
+    """
+    Decode an image file at thumbnail size with libvips.
+
+    Returns a null QImage if libvips cannot read the file.
+    """
+    try:
+        image = pyvips.Image.thumbnail(image_path, width, height=height)  # Also applies the EXIF orientation
+        image = image.colourspace("srgb")
+        if image.format != "uchar":
+            image = image.cast("uchar")
+    except pyvips.Error:
+        return QImage()
+
+    if image.bands == 4:
+        image_format = QImage.Format.Format_RGBA8888
+    elif image.bands == 3:
+        image_format = QImage.Format.Format_RGB888
+    else:
+        return QImage()
+
+    buffer = image.write_to_memory()
+    # Copy so the QImage owns its pixels once the buffer goes away
+    return QImage(buffer, image.width, image.height, image.width * image.bands, image_format).copy()
+
+
+def decode_thumbnail(image_path, width, height):
+    """
+    Decode an image file directly at thumbnail size.
+
+    libvips is used when it is installed and can read the file. Otherwise
+    QImageReader.setScaledSize lets decoders that support it (e.g. libjpeg DCT scaling)
+    skip the full-resolution decode; other formats are scaled by the reader itself.
+    """
+    if pyvips is not None:
+        image = decode_thumbnail_vips(image_path, width, height)
+        if not image.isNull():
+            return image
+
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)  # Apply the EXIF orientation
+
+    size = reader.size()
+    if size.isValid():
+        if size.width() * size.height() > MAX_THUMBNAIL_SOURCE_PIXELS and not reader.supportsOption(QImageIOHandler.ImageOption.ScaledSize):
+            # Would be decoded at full resolution first, e.g. a huge PNG, TIFF or BMP
+            return QImage()
+        size.scale(width, height, Qt.AspectRatioMode.KeepAspectRatio)
+        reader.setScaledSize(size)
+        return reader.read()
+
+    # The size is unknown before decoding, read the full image and scale it afterwards.
+    # QImageReader's default allocation limit (256 MB) rejects images that would not fit into it.
+    image = reader.read()
+    if image.isNull():
+        return image
+    # Nearest neighbour is good enough for the final fit of an image already close to the target size
+    if image.width() <= 2 * width and image.height() <= 2 * height:
+        transformation = Qt.TransformationMode.FastTransformation
+    else:
+        transformation = Qt.TransformationMode.SmoothTransformation
+    return image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio, transformation)
+
+
+def load_thumbnail(image_path, width, height):
+    """
+    Load the thumbnail of an image file scaled down to fit into width x height.
+
+    Cached thumbnails are read back from disk; otherwise the image is decoded and the
+    result is stored in the cache. Runs on a worker thread, so it only uses QImage
+    (QPixmap is GUI-thread only). Returns a null QImage if the file cannot be decoded.
+    """
+    try:
+        cache_path = thumbnail_cache_path(image_path, width, height)
+    except OSError:
+        return QImage()
+
+    if cache_path is None:
+        return decode_thumbnail(image_path, width, height)
+
+    if os.path.exists(cache_path):
+        image = QImage(cache_path)
+        if not image.isNull():
+            return image
+
+    image = decode_thumbnail(image_path, width, height)
+    if not image.isNull():
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Write to a temporary file first so a concurrent reader never sees a partial PNG.
+            # Thread idents are only unique within a process, other app instances share the cache.
+            temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                if image.save(temp_path, "PNG"):
+                    os.replace(temp_path, cache_path)
+            finally:
+                # Left behind only if the save failed, e.g. with a partially written file
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        except OSError as e:
+            print(f"Failed to cache thumbnail: {e}")
+    return image
+
+
+class WorkerSignals(QObject):
+    # Emitted with the source path and the decoded thumbnail (null if decoding failed)
+    result = pyqtSignal(str, QImage)
+
+
+class ThumbnailBatchWorker(QRunnable):
+    """Loads the thumbnails of several files, reporting each one through the same signals object."""
+
+    def __init__(self, image_paths, width, height):
+        super().__init__()
+        self.image_paths = image_paths
+        self.width = width
+        self.height = height
+        self.signals = WorkerSignals()
+        self.cancelled_paths = set()
+
+    def cancel(self, image_path):
+        # Checked by run(); a thumbnail that is already decoding finishes but is not reported back
+        self.cancelled_paths.add(image_path)
+
+    def run(self):
+        for image_path in self.image_paths:
+            if image_path in self.cancelled_paths:
+                continue
+            image = load_thumbnail(image_path, self.width, self.height)
+            if image_path not in self.cancelled_paths:
+                self.signals.result.emit(image_path, image)
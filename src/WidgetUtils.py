@@ -2,14 +2,26 @@ from PyQt6.QtWidgets import QPushButton, QSlider, QApplication
 from PyQt6.QtGui import QIcon, QPalette
 from PyQt6.QtCore import QSize
 
+_icon_cache = {}
+
+def load_icon(icon_path):
+    """Return the QIcon for an icon file, loading each file only once per process."""
+    # Must be called after the QApplication has been created
+    icon = _icon_cache.get(icon_path)
+    if icon is None:
+        icon = QIcon(icon_path)
+        _icon_cache[icon_path] = icon
+    return icon
+
 class HoverButton(QPushButton):
     def __init__(self, parent, text, icon, icon_size, button_size, *args, **kwargs):
         super().__init__(text, parent, *args, **kwargs)
         self.setMouseTracking(True)  # Enable mouse tracking for hovering
         self.button_size = button_size
         self.icon_size = icon_size
-        self.icon_path = icon
-        self.setIcon(QIcon(self.icon_path))  # Set icon
+        if not isinstance(icon, QIcon):
+            icon = load_icon(icon)  # Icon file path
+        self.setIcon(icon)  # Set icon
         self.setFixedSize(self.button_size)  # Set fixed size
         self.setIconSize(self.icon_size)  # Set icon size
         self.setToolTip(text)
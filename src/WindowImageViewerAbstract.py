@@ -116,6 +116,12 @@ class ImageViewerWindowAbstract(QWidget):
     def histogram_pressed(self):
         self.image_viewer.toggle_info_display()
     
+    def closeEvent(self, event):
+        # The window is only hidden, not destroyed: release its images so they do not stay in memory
+        self.pixmap_image_orig = None
+        self.image_viewer.clear_image()
+        super().closeEvent(event)
+
     def keyPressEvent(self, event):
         self.image_viewer.keyPressEvent(event)
         super().keyPressEvent(event)
\ No newline at end of file